@@ -16,36 +16,107 @@ Options:
 import argparse
 import base64
 import binascii
+import functools
+import io
 import json
+import re
 import sys
-import urllib.parse
-from typing import Any, Dict, List, Optional
-from urllib.parse import parse_qs, urlparse
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from urllib.parse import unquote
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON, binding to orjson on first use when it is installed"""
+    # orjson pulls in dataclasses/inspect, so --help and --version skip it
+    global _json_loads
+    try:
+        import orjson
+
+        _json_loads = orjson.loads
+    except ImportError:
+        _json_loads = json.loads
+    return _json_loads(data)
 
-import yaml
 
 VERSION = "0.1.2"
 
+# Strings YAML would misread as plain scalars: empty, starting with an
+# indicator or digit, ending in a space or ':', or holding ': ' or ' #'
+_YAML_UNSAFE = re.compile(r"^$|^[-?:,\[\]{}#&*!|>'\"%@`<=~.+ 0-9]|[ :]$|: | #").search
+# Plain words that YAML would resolve to booleans or null
+_YAML_KEYWORDS = frozenset(
+    ["y", "n", "yes", "no", "true", "false", "on", "off", "null"]
+)
+# Characters json.dumps leaves raw that break or are disallowed in YAML
+_YAML_ESCAPE_RE = re.compile("[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff\ufffe\uffff]")
+
+
+def _b64decode(data: str) -> bytes:
+    """Decode standard or URL-safe base64, adding missing padding"""
+    pad = -len(data) & 3
+    return base64.urlsafe_b64decode(data + "===="[:pad] if pad else data)
+
+
+# Percent-decoding an emoji/CJK string costs ~5 us; a cache hit ~0.1 us
+_unquote = functools.lru_cache(maxsize=2048)(unquote)
+
+
+def _parse_query(query: str) -> Dict[str, str]:
+    """Parse a query string like parse_qs, keeping each key's first value"""
+    params = {}
+    for pair in query.split("&"):
+        key, _, value = pair.partition("=")
+        # parse_qs drops blank values, so defaults still apply to them
+        if value:
+            params.setdefault(
+                _unquote(key.replace("+", " ")), _unquote(value.replace("+", " "))
+            )
+    return params
+
+
+# scheme://[userinfo@]host[:port][/path][?query][#fragment]
+_PROXY_URL_RE = re.compile(
+    r"[a-z]+://(?:([^/?#]*)@)?(\[[^\]]*\]|[^:/?#]*)(?::(\d*))?"
+    r"(?:/[^?#]*)?(?:\?([^#]*))?(?:#(.*))?",
+    re.DOTALL,
+)
+
+
+def _split_url(url: str) -> Tuple[str, str, Optional[int], str, str]:
+    """Split a proxy URL into userinfo, host, port, query and fragment"""
+    match = _PROXY_URL_RE.fullmatch(url)
+    if not match:
+        raise ValueError(f"malformed URL {url[:50]!r}")
+    userinfo, host, port, query, fragment = match.groups()
+    if port and int(port) > 65535:
+        raise ValueError(f"port {port} out of range 0-65535")
+    # Same normalization as urlparse().hostname. Unlike urlparse().username,
+    # userinfo is kept whole, so a Trojan password may contain ':'
+    host = host.strip("[]").lower()
+    return (
+        userinfo or "",
+        host,
+        int(port) if port else None,
+        query or "",
+        fragment or "",
+    )
+
 
 def decode_vmess(vmess_url: str) -> Optional[Dict[str, Any]]:
     """Decode VMess URL to proxy config"""
     try:
         # Remove vmess:// prefix
         encoded = vmess_url[8:]
-        # Decode base64 with error handling
+        decoded_bytes = _b64decode(encoded)
         try:
-            decoded_bytes = base64.b64decode(encoded + "=" * (4 - len(encoded) % 4))
-            decoded = decoded_bytes.decode("utf-8")
-        except (UnicodeDecodeError, binascii.Error):
-            # Try latin-1 encoding as fallback
-            try:
-                decoded_bytes = base64.b64decode(encoded + "=" * (4 - len(encoded) % 4))
-                decoded = decoded_bytes.decode("latin-1")
-            except (UnicodeDecodeError, binascii.Error):
-                return None
-        config = json.loads(decoded)
-
-        return {
+            # Both parsers decode UTF-8 bytes themselves, without a str copy
+            config = _json_loads(decoded_bytes)
+        except ValueError:
+            # Invalid UTF-8 only affects the display name, so replace it
+            config = _json_loads(decoded_bytes.decode("utf-8", errors="replace"))
+
+        network = config.get("net", "tcp")
+        proxy = {
             "name": config.get("ps", "VMess"),
             "type": "vmess",
             "server": config.get("add", ""),
@@ -53,31 +124,29 @@ def decode_vmess(vmess_url: str) -> Optional[Dict[str, Any]]:
             "uuid": config.get("id", ""),
             "alterId": int(config.get("aid", 0)),
             "cipher": config.get("scy", "auto"),
-            "network": config.get("net", "tcp"),
+            "network": network,
             "tls": config.get("tls") == "tls",
             "skip-cert-verify": True,
             "servername": config.get("sni", ""),
-            "ws-opts": (
-                {
-                    "path": config.get("path", "/"),
-                    "headers": (
-                        {"Host": config.get("host", "")} if config.get("host") else {}
-                    ),
-                }
-                if config.get("net") == "ws"
-                else None
-            ),
-            "h2-opts": (
-                {"host": [config.get("host", "")], "path": config.get("path", "/")}
-                if config.get("net") == "h2"
-                else None
-            ),
-            "grpc-opts": (
-                {"grpc-service-name": config.get("path", "")}
-                if config.get("net") == "grpc"
-                else None
-            ),
         }
+
+        # Only the transport actually in use gets an options block
+        if network == "ws":
+            proxy["ws-opts"] = {
+                "path": config.get("path", "/"),
+                "headers": (
+                    {"Host": config.get("host", "")} if config.get("host") else {}
+                ),
+            }
+        elif network == "h2":
+            proxy["h2-opts"] = {
+                "host": [config.get("host", "")],
+                "path": config.get("path", "/"),
+            }
+        elif network == "grpc":
+            proxy["grpc-opts"] = {"grpc-service-name": config.get("path", "")}
+
+        return proxy
     except Exception:
         print("Warning: Skipping malformed VMess URL (encoding error)", file=sys.stderr)
         return None
@@ -86,33 +155,32 @@ def decode_vmess(vmess_url: str) -> Optional[Dict[str, Any]]:
 def decode_vless(vless_url: str) -> Optional[Dict[str, Any]]:
     """Decode VLESS URL to proxy config"""
     try:
-        parsed = urlparse(vless_url)
-        params = parse_qs(parsed.query)
+        uuid, server, port, query, fragment = _split_url(vless_url)
+        params = _parse_query(query)
+        get = params.get
+        network = get("type", "tcp")
+        host = get("host", "")
 
         config = {
-            "name": urllib.parse.unquote(parsed.fragment) or "VLESS",
+            "name": _unquote(fragment) or "VLESS",
             "type": "vless",
-            "server": parsed.hostname,
-            "port": parsed.port or 443,
-            "uuid": parsed.username,
-            "network": params.get("type", ["tcp"])[0],
-            "tls": params.get("security", [""])[0] == "tls",
+            "server": server,
+            "port": port or 443,
+            "uuid": uuid,
+            "network": network,
+            "tls": get("security", "") == "tls",
             "skip-cert-verify": True,
-            "servername": params.get("sni", [""])[0],
-            "flow": params.get("flow", [""])[0],
+            "servername": get("sni", ""),
+            "flow": get("flow", ""),
         }
 
-        if config["network"] == "ws":
+        if network == "ws":
             config["ws-opts"] = {
-                "path": params.get("path", ["/"])[0],
-                "headers": (
-                    {"Host": params.get("host", [""])[0]} if params.get("host") else {}
-                ),
-            }
-        elif config["network"] == "grpc":
-            config["grpc-opts"] = {
-                "grpc-service-name": params.get("serviceName", [""])[0]
+                "path": get("path", "/"),
+                "headers": {"Host": host} if host else {},
             }
+        elif network == "grpc":
+            config["grpc-opts"] = {"grpc-service-name": get("serviceName", "")}
 
         return config
     except Exception as e:
@@ -120,63 +188,31 @@ def decode_vless(vless_url: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+# method:password@server:port, as embedded in legacy ss:// links
+_SS_RE = re.compile(r"([^:]+):(.*)@([^@]+):(\d+)")
+
+
 def decode_ss(ss_url: str) -> Optional[Dict[str, Any]]:
     """Decode Shadowsocks URL to proxy config"""
     try:
-        # Handle ss://method:password@server:port#name format
-        if "@" in ss_url:
-            parts = ss_url[5:].split("@")
-            if len(parts) != 2:
-                return None
-
-            # Decode method:password with error handling
-            try:
-                decoded_bytes = base64.b64decode(
-                    parts[0] + "=" * (4 - len(parts[0]) % 4)
-                )
-                method_pass = decoded_bytes.decode("utf-8")
-            except (UnicodeDecodeError, binascii.Error):
-                # Try latin-1 encoding as fallback
-                try:
-                    decoded_bytes = base64.b64decode(
-                        parts[0] + "=" * (4 - len(parts[0]) % 4)
-                    )
-                    method_pass = decoded_bytes.decode("latin-1")
-                except (UnicodeDecodeError, binascii.Error):
-                    return None
+        body, _, fragment = ss_url[5:].partition("#")
+        name = _unquote(fragment) or "SS"
+
+        if "@" in body:
+            # Handle ss://base64(method:password)@server:port#name format
+            userinfo, server, port, query, _ = _split_url(ss_url)
+            if port is None or query:
+                # Missing port, or SIP003 plugin options we can't carry over
+                raise ValueError("unsupported SS URL")
+            method_pass = _b64decode(userinfo).decode("utf-8", errors="replace")
             method, password = method_pass.split(":", 1)
-
-            # Parse server:port#name
-            server_part = parts[1]
-            if "#" in server_part:
-                server_port, name = server_part.split("#", 1)
-                name = urllib.parse.unquote(name)
-            else:
-                server_port = server_part
-                name = "SS"
-
-            server, port = server_port.rsplit(":", 1)
         else:
-            # Handle ss://base64encoded#name format
-            url_parts = ss_url[5:].split("#")
-            encoded = url_parts[0]
-            name = urllib.parse.unquote(url_parts[1]) if len(url_parts) > 1 else "SS"
-
-            try:
-                decoded_bytes = base64.b64decode(encoded + "=" * (4 - len(encoded) % 4))
-                decoded = decoded_bytes.decode("utf-8")
-            except (UnicodeDecodeError, binascii.Error):
-                # Try latin-1 encoding as fallback
-                try:
-                    decoded_bytes = base64.b64decode(
-                        encoded + "=" * (4 - len(encoded) % 4)
-                    )
-                    decoded = decoded_bytes.decode("latin-1")
-                except (UnicodeDecodeError, binascii.Error):
-                    return None
-            method, rest = decoded.split(":", 1)
-            password, server_port = rest.rsplit("@", 1)
-            server, port = server_port.rsplit(":", 1)
+            # Handle ss://base64(method:password@server:port)#name format
+            decoded = _b64decode(body).decode("utf-8", errors="replace")
+            match = _SS_RE.fullmatch(decoded)
+            if not match:
+                raise ValueError("unrecognized SS payload")
+            method, password, server, port = match.groups()
 
         return {
             "name": name,
@@ -185,8 +221,6 @@ def decode_ss(ss_url: str) -> Optional[Dict[str, Any]]:
             "port": int(port),
             "cipher": method,
             "password": password,
-            "plugin": None,
-            "plugin-opts": {},
         }
     except Exception:
         print("Warning: Skipping malformed SS URL (encoding error)", file=sys.stderr)
@@ -196,26 +230,26 @@ def decode_ss(ss_url: str) -> Optional[Dict[str, Any]]:
 def decode_trojan(trojan_url: str) -> Optional[Dict[str, Any]]:
     """Decode Trojan URL to proxy config"""
     try:
-        parsed = urlparse(trojan_url)
-        params = parse_qs(parsed.query)
+        password, server, port, query, fragment = _split_url(trojan_url)
+        params = _parse_query(query)
+        get = params.get
+        host = get("host", "")
 
         config = {
-            "name": urllib.parse.unquote(parsed.fragment) or "Trojan",
+            "name": _unquote(fragment) or "Trojan",
             "type": "trojan",
-            "server": parsed.hostname,
-            "port": parsed.port or 443,
-            "password": parsed.username,
+            "server": server,
+            "port": port or 443,
+            "password": password,
             "skip-cert-verify": True,
-            "sni": params.get("sni", [""])[0] or parsed.hostname,
+            "sni": get("sni", "") or server,
         }
 
-        if params.get("type", [""])[0] == "ws":
+        if get("type", "") == "ws":
             config["network"] = "ws"
             config["ws-opts"] = {
-                "path": params.get("path", ["/"])[0],
-                "headers": (
-                    {"Host": params.get("host", [""])[0]} if params.get("host") else {}
-                ),
+                "path": get("path", "/"),
+                "headers": {"Host": host} if host else {},
             }
 
         return config
@@ -224,270 +258,385 @@ def decode_trojan(trojan_url: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+_DECODERS = {
+    "vmess": decode_vmess,
+    "vless": decode_vless,
+    "ss": decode_ss,
+    "trojan": decode_trojan,
+}
+# Built from _DECODERS so a new scheme only needs registering there
+_SCHEME_PREFIXES = tuple(f"{scheme}://" for scheme in _DECODERS)
+# Either alphabet, optionally wrapped into lines as MIME encoders do
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/_\r\n-]+=*")
+# Runs between the separators str.splitlines() breaks on
+_LINE_RE = re.compile("[^\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]+")
+
+
 def parse_subscription(content: str) -> List[Dict[str, Any]]:
     """Parse subscription content and extract proxy configs"""
+    return _parse_proxies(content)[0]
+
+
+def _parse_proxies(content: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Parse subscription content into proxy configs and their names"""
     proxies = []
+    names = []
 
-    # Try to decode as base64 first (only if content looks like base64)
-    # Base64 content should not contain newlines or comments
-    if "\n" not in content.strip() and not content.strip().startswith("#"):
+    # Try to decode as base64 first (only if content looks like base64).
+    # Plain subscriptions fail the sniff at the first ':' or '#'.
+    stripped = content.strip()
+    if _BASE64_RE.fullmatch(stripped):
         try:
-            decoded_bytes = base64.b64decode(content + "=" * (4 - len(content) % 4))
-            try:
-                decoded_content = decoded_bytes.decode("utf-8")
-                # Only use decoded content if it contains proxy URLs
-                if any(
-                    proto in decoded_content
-                    for proto in ["vmess://", "vless://", "ss://", "trojan://"]
-                ):
-                    content = decoded_content
-            except UnicodeDecodeError:
-                # If UTF-8 fails, don't try latin-1 fallback for base64
-                pass
-        except (binascii.Error, Exception):
+            # No latin-1 fallback: a non-UTF-8 payload isn't a subscription
+            decoded_content = _b64decode("".join(stripped.split())).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
             pass
-
-    # Split by lines and process each URL
-    lines = content.strip().split("\n")
-
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith("#"):
+        else:
+            # Only use decoded content if it contains proxy URLs
+            if any(prefix in decoded_content for prefix in _SCHEME_PREFIXES):
+                content = decoded_content
+
+    # Walk the lines lazily rather than holding a list of all of them
+    for line_match in _LINE_RE.finditer(content):
+        line = line_match.group().strip()
+        # Blank lines, comments and unknown schemes have no decoder
+        scheme, sep, _ = line.partition("://")
+        decoder = _DECODERS.get(scheme) if sep else None
+        if decoder is None:
             continue
 
         try:
-            if line.startswith("vmess://"):
-                proxy = decode_vmess(line)
-            elif line.startswith("vless://"):
-                proxy = decode_vless(line)
-            elif line.startswith("ss://"):
-                proxy = decode_ss(line)
-            elif line.startswith("trojan://"):
-                proxy = decode_trojan(line)
-            else:
-                continue
-
+            proxy = decoder(line)
             if proxy:
-                # Clean up None values
-                proxy = {k: v for k, v in proxy.items() if v is not None}
                 proxies.append(proxy)
+                names.append(proxy["name"])
 
         except Exception as e:
             print(f"Error parsing line: {line[:50]}... - {e}", file=sys.stderr)
             continue
 
-    return proxies
+    return proxies, names
+
+
+# Domains that must resolve to real IPs rather than fake-ip addresses
+_FAKE_IP_FILTER = (
+    "*.lan",
+    "*.localdomain",
+    "*.example",
+    "*.invalid",
+    "*.localhost",
+    "*.test",
+    "*.local",
+    "*.home.arpa",
+    "+.msftconnecttest.com",
+    "+.msftncsi.com",
+    "localhost.ptlogin2.qq.com",
+    "+.srv.nintendo.net",
+    "+.stun.playstation.net",
+    "xbox.*.microsoft.com",
+    "+.battlenet.com.cn",
+    "+.wotgame.cn",
+    "+.wggames.cn",
+    "+.wowsgame.cn",
+    "+.wargaming.net",
+    "music.163.com",
+    "*.music.163.com",
+    "*.126.net",
+    "musicapi.taihe.com",
+    "music.taihe.com",
+    "songsearch.kugou.com",
+    "trackercdn.kugou.com",
+    "*.kuwo.cn",
+    "api-jooxtt.sanook.com",
+    "api.joox.com",
+    "joox.com",
+    "y.qq.com",
+    "*.y.qq.com",
+    "streamoc.music.tc.qq.com",
+    "mobileoc.music.tc.qq.com",
+    "isure.stream.qqmusic.qq.com",
+    "dl.stream.qqmusic.qq.com",
+    "aqqmusic.tc.qq.com",
+    "amobile.music.tc.qq.com",
+    "*.xiami.com",
+    "*.music.migu.cn",
+    "music.migu.cn",
+)
+
+# Leading scalar settings; key order here is the output order
+_CONFIG_HEADER = {
+    "port": 7890,
+    "socks-port": 7891,
+    "allow-lan": False,
+    "mode": "rule",
+    "log-level": "info",
+    "external-controller": "127.0.0.1:9090",
+}
+
+# Leaves are tuples; _dns_config() hands each call its own lists
+_STATIC_DNS = {
+    "enable": True,
+    "listen": "0.0.0.0:53",
+    "ipv6": False,
+    "default-nameserver": ("114.114.114.114", "223.5.5.5"),
+    "enhanced-mode": "fake-ip",
+    "fake-ip-range": "198.18.0.1/16",
+    "fake-ip-filter": _FAKE_IP_FILTER,
+    "nameserver": ("119.29.29.29", "223.5.5.5", "114.114.114.114", "8.8.8.8"),
+    "fallback": (
+        "https://dns.cloudflare.com/dns-query",
+        "https://dns.google/dns-query",
+        "tls://dns.google",
+    ),
+    "fallback-filter": {
+        "geoip": True,
+        "geoip-code": "CN",
+        "ipcidr": ("240.0.0.0/4",),
+    },
+}
+
+
+def _dns_config() -> Dict[str, Any]:
+    """Build a fresh DNS block from _STATIC_DNS using shallow copies"""
+    dns = _STATIC_DNS
+    return {
+        **dns,
+        "default-nameserver": list(dns["default-nameserver"]),
+        "fake-ip-filter": list(dns["fake-ip-filter"]),
+        "nameserver": list(dns["nameserver"]),
+        "fallback": list(dns["fallback"]),
+        "fallback-filter": {
+            **dns["fallback-filter"],
+            "ipcidr": list(dns["fallback-filter"]["ipcidr"]),
+        },
+    }
 
 
-def generate_clash_config(proxies: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Generate complete Clash configuration for Chinese users"""
-    proxy_names = [proxy["name"] for proxy in proxies]
+# Proxy-group names, interned so every reference shares one object
+_G_SELECT = sys.intern("🚀 节点选择")
+_G_AUTO = sys.intern("♻️ 自动选择")
+_G_DIRECT = sys.intern("🎯 全球直连")
+_G_ADBLOCK = sys.intern("🛑 广告拦截")
+_G_BILIBILI = sys.intern("📺 哔哩哔哩")
+_G_NETEASE = sys.intern("🎵 网易云音乐")
+_G_YOUTUBE = sys.intern("📹 YouTube")
+_G_NETFLIX = sys.intern("🎬 Netflix")
+_G_TELEGRAM = sys.intern("📱 Telegram")
+_G_GOOGLE = sys.intern("🔍 Google")
+_G_APPLE = sys.intern("🍎 苹果服务")
+_G_MICROSOFT = sys.intern("Ⓜ️ 微软服务")
+_G_FCM = sys.intern("📢 谷歌FCM")
+_G_FINAL = sys.intern("🐟 漏网之鱼")
+
+_STATIC_RULES = (
+    # Local network
+    "DOMAIN-SUFFIX,local,DIRECT",
+    "IP-CIDR,127.0.0.0/8,DIRECT",
+    "IP-CIDR,172.16.0.0/12,DIRECT",
+    "IP-CIDR,192.168.0.0/16,DIRECT",
+    "IP-CIDR,10.0.0.0/8,DIRECT",
+    "IP-CIDR,17.0.0.0/8,DIRECT",
+    "IP-CIDR,100.64.0.0/10,DIRECT",
+    # Ad blocking
+    f"DOMAIN-KEYWORD,googleads,{_G_ADBLOCK}",
+    f"DOMAIN-KEYWORD,googlesyndication,{_G_ADBLOCK}",
+    f"DOMAIN-KEYWORD,googletagmanager,{_G_ADBLOCK}",
+    f"DOMAIN,pagead2.googlesyndication.com,{_G_ADBLOCK}",
+    # Chinese services
+    f"DOMAIN,clash.razord.top,{_G_DIRECT}",
+    f"DOMAIN,yacd.haishan.me,{_G_DIRECT}",
+    # Specific services
+    f"DOMAIN-KEYWORD,youtube,{_G_YOUTUBE}",
+    f"DOMAIN,youtubei.googleapis.com,{_G_YOUTUBE}",
+    f"DOMAIN-SUFFIX,googlevideo.com,{_G_YOUTUBE}",
+    f"DOMAIN-SUFFIX,youtube.com,{_G_YOUTUBE}",
+    f"DOMAIN-SUFFIX,ytimg.com,{_G_YOUTUBE}",
+    f"DOMAIN-KEYWORD,netflix,{_G_NETFLIX}",
+    f"DOMAIN-SUFFIX,netflix.com,{_G_NETFLIX}",
+    f"DOMAIN-SUFFIX,netflix.net,{_G_NETFLIX}",
+    f"DOMAIN-SUFFIX,nflximg.net,{_G_NETFLIX}",
+    f"DOMAIN-SUFFIX,nflxext.com,{_G_NETFLIX}",
+    f"DOMAIN-SUFFIX,nflxso.net,{_G_NETFLIX}",
+    f"DOMAIN-SUFFIX,nflxvideo.net,{_G_NETFLIX}",
+    f"DOMAIN-KEYWORD,telegram,{_G_TELEGRAM}",
+    f"DOMAIN-SUFFIX,t.me,{_G_TELEGRAM}",
+    f"DOMAIN-SUFFIX,tdesktop.com,{_G_TELEGRAM}",
+    f"DOMAIN-SUFFIX,telegram.me,{_G_TELEGRAM}",
+    f"DOMAIN-SUFFIX,telegram.org,{_G_TELEGRAM}",
+    f"DOMAIN-SUFFIX,telesco.pe,{_G_TELEGRAM}",
+    f"DOMAIN-KEYWORD,bilibili,{_G_BILIBILI}",
+    f"DOMAIN-SUFFIX,acg.tv,{_G_BILIBILI}",
+    f"DOMAIN-SUFFIX,acgvideo.com,{_G_BILIBILI}",
+    f"DOMAIN-SUFFIX,b23.tv,{_G_BILIBILI}",
+    f"DOMAIN-SUFFIX,bilibili.com,{_G_BILIBILI}",
+    f"DOMAIN-SUFFIX,bilivideo.com,{_G_BILIBILI}",
+    f"DOMAIN-SUFFIX,hdslb.com,{_G_BILIBILI}",
+    f"DOMAIN,music.163.com,{_G_NETEASE}",
+    f"DOMAIN-SUFFIX,music.163.com,{_G_NETEASE}",
+    f"DOMAIN-SUFFIX,163yun.com,{_G_NETEASE}",
+    f"DOMAIN-SUFFIX,126.net,{_G_NETEASE}",
+    f"DOMAIN-SUFFIX,163.com,{_G_NETEASE}",
+    f"DOMAIN-KEYWORD,microsoft,{_G_MICROSOFT}",
+    f"DOMAIN-SUFFIX,bing.com,{_G_MICROSOFT}",
+    f"DOMAIN-SUFFIX,microsoft.com,{_G_MICROSOFT}",
+    f"DOMAIN-SUFFIX,office.com,{_G_MICROSOFT}",
+    f"DOMAIN-SUFFIX,outlook.com,{_G_MICROSOFT}",
+    f"DOMAIN-SUFFIX,xbox.com,{_G_MICROSOFT}",
+    f"DOMAIN,mtalk.google.com,{_G_FCM}",
+    f"DOMAIN,alt1-mtalk.google.com,{_G_FCM}",
+    f"DOMAIN,alt2-mtalk.google.com,{_G_FCM}",
+    f"DOMAIN,alt3-mtalk.google.com,{_G_FCM}",
+    f"DOMAIN,alt4-mtalk.google.com,{_G_FCM}",
+    # GeoIP rules
+    f"GEOIP,LAN,{_G_DIRECT}",
+    f"GEOIP,CN,{_G_DIRECT}",
+    f"MATCH,{_G_FINAL}",
+)
+
+# (name, type, leading members, whether every proxy is appended)
+_GROUP_SPECS = [
+    (_G_SELECT, "select", (_G_AUTO, _G_DIRECT), True),
+    (_G_AUTO, "url-test", (), True),
+    (_G_DIRECT, "select", ("DIRECT",), False),
+    (_G_ADBLOCK, "select", ("REJECT", "DIRECT"), False),
+    (_G_BILIBILI, "select", (_G_DIRECT,), True),
+    (_G_NETEASE, "select", (_G_DIRECT,), True),
+    (_G_YOUTUBE, "select", (_G_SELECT,), True),
+    (_G_NETFLIX, "select", (_G_SELECT,), True),
+    (_G_TELEGRAM, "select", (_G_SELECT,), True),
+    (_G_GOOGLE, "select", (_G_SELECT,), True),
+    (_G_APPLE, "select", (_G_DIRECT, _G_SELECT), True),
+    (_G_MICROSOFT, "select", (_G_DIRECT, _G_SELECT), True),
+    (_G_FCM, "select", (_G_SELECT, _G_DIRECT), True),
+    (_G_FINAL, "select", (_G_SELECT, _G_DIRECT), True),
+]
+_GROUP_MEMBER_KEYS = frozenset((spec[2], spec[3]) for spec in _GROUP_SPECS)
+_URL_TEST_OPTIONS = {
+    "url": "http://www.gstatic.com/generate_204",
+    "interval": 300,
+    "tolerance": 50,
+}
+
+
+def generate_clash_config(
+    proxies: List[Dict[str, Any]], proxy_names: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Generate complete Clash configuration for Chinese users
+
+    Proxy groups with the same members share one "proxies" list object, so
+    copy a group's list before editing it in place. yaml.safe_dump() writes
+    the shared lists as anchors and aliases; dump_yaml() writes them in full.
+    """
+    if proxy_names is None:
+        proxy_names = [proxy["name"] for proxy in proxies]
+
+    # Groups with the same leading members share one member list
+    members = {
+        key: list(key[0]) + proxy_names if key[1] else list(key[0])
+        for key in _GROUP_MEMBER_KEYS
+    }
+    proxy_groups = [
+        {
+            "name": name,
+            "type": group_type,
+            "proxies": members[prefix, with_proxies],
+            **(_URL_TEST_OPTIONS if group_type == "url-test" else {}),
+        }
+        for name, group_type, prefix, with_proxies in _GROUP_SPECS
+    ]
 
     config = {
-        "port": 7890,
-        "socks-port": 7891,
-        "allow-lan": False,
-        "mode": "rule",
-        "log-level": "info",
-        "external-controller": "127.0.0.1:9090",
-        "dns": {
-            "enable": True,
-            "listen": "0.0.0.0:53",
-            "ipv6": False,
-            "default-nameserver": ["114.114.114.114", "223.5.5.5"],
-            "enhanced-mode": "fake-ip",
-            "fake-ip-range": "198.18.0.1/16",
-            "fake-ip-filter": [
-                "*.lan",
-                "*.localdomain",
-                "*.example",
-                "*.invalid",
-                "*.localhost",
-                "*.test",
-                "*.local",
-                "*.home.arpa",
-                "+.msftconnecttest.com",
-                "+.msftncsi.com",
-                "localhost.ptlogin2.qq.com",
-                "+.srv.nintendo.net",
-                "+.stun.playstation.net",
-                "xbox.*.microsoft.com",
-                "+.battlenet.com.cn",
-                "+.wotgame.cn",
-                "+.wggames.cn",
-                "+.wowsgame.cn",
-                "+.wargaming.net",
-                "music.163.com",
-                "*.music.163.com",
-                "*.126.net",
-                "musicapi.taihe.com",
-                "music.taihe.com",
-                "songsearch.kugou.com",
-                "trackercdn.kugou.com",
-                "*.kuwo.cn",
-                "api-jooxtt.sanook.com",
-                "api.joox.com",
-                "joox.com",
-                "y.qq.com",
-                "*.y.qq.com",
-                "streamoc.music.tc.qq.com",
-                "mobileoc.music.tc.qq.com",
-                "isure.stream.qqmusic.qq.com",
-                "dl.stream.qqmusic.qq.com",
-                "aqqmusic.tc.qq.com",
-                "amobile.music.tc.qq.com",
-                "*.xiami.com",
-                "*.music.migu.cn",
-                "music.migu.cn",
-            ],
-            "nameserver": ["119.29.29.29", "223.5.5.5", "114.114.114.114", "8.8.8.8"],
-            "fallback": [
-                "https://dns.cloudflare.com/dns-query",
-                "https://dns.google/dns-query",
-                "tls://dns.google",
-            ],
-            "fallback-filter": {
-                "geoip": True,
-                "geoip-code": "CN",
-                "ipcidr": ["240.0.0.0/4"],
-            },
-        },
+        **_CONFIG_HEADER,
+        # Fresh copies so callers editing the result leave the defaults alone
+        "dns": _dns_config(),
         "proxies": proxies,
-        "proxy-groups": [
-            {
-                "name": "🚀 节点选择",
-                "type": "select",
-                "proxies": ["♻️ 自动选择", "🎯 全球直连"] + proxy_names,
-            },
-            {
-                "name": "♻️ 自动选择",
-                "type": "url-test",
-                "proxies": proxy_names,
-                "url": "http://www.gstatic.com/generate_204",
-                "interval": 300,
-                "tolerance": 50,
-            },
-            {"name": "🎯 全球直连", "type": "select", "proxies": ["DIRECT"]},
-            {"name": "🛑 广告拦截", "type": "select", "proxies": ["REJECT", "DIRECT"]},
-            {
-                "name": "📺 哔哩哔哩",
-                "type": "select",
-                "proxies": ["🎯 全球直连"] + proxy_names,
-            },
-            {
-                "name": "🎵 网易云音乐",
-                "type": "select",
-                "proxies": ["🎯 全球直连"] + proxy_names,
-            },
-            {
-                "name": "📹 YouTube",
-                "type": "select",
-                "proxies": ["🚀 节点选择"] + proxy_names,
-            },
-            {
-                "name": "🎬 Netflix",
-                "type": "select",
-                "proxies": ["🚀 节点选择"] + proxy_names,
-            },
-            {
-                "name": "📱 Telegram",
-                "type": "select",
-                "proxies": ["🚀 节点选择"] + proxy_names,
-            },
-            {
-                "name": "🔍 Google",
-                "type": "select",
-                "proxies": ["🚀 节点选择"] + proxy_names,
-            },
-            {
-                "name": "🍎 苹果服务",
-                "type": "select",
-                "proxies": ["🎯 全球直连", "🚀 节点选择"] + proxy_names,
-            },
-            {
-                "name": "Ⓜ️ 微软服务",
-                "type": "select",
-                "proxies": ["🎯 全球直连", "🚀 节点选择"] + proxy_names,
-            },
-            {
-                "name": "📢 谷歌FCM",
-                "type": "select",
-                "proxies": ["🚀 节点选择", "🎯 全球直连"] + proxy_names,
-            },
-            {
-                "name": "🐟 漏网之鱼",
-                "type": "select",
-                "proxies": ["🚀 节点选择", "🎯 全球直连"] + proxy_names,
-            },
-        ],
-        "rules": [
-            # Local network
-            "DOMAIN-SUFFIX,local,DIRECT",
-            "IP-CIDR,127.0.0.0/8,DIRECT",
-            "IP-CIDR,172.16.0.0/12,DIRECT",
-            "IP-CIDR,192.168.0.0/16,DIRECT",
-            "IP-CIDR,10.0.0.0/8,DIRECT",
-            "IP-CIDR,17.0.0.0/8,DIRECT",
-            "IP-CIDR,100.64.0.0/10,DIRECT",
-            # Ad blocking
-            "DOMAIN-KEYWORD,googleads,🛑 广告拦截",
-            "DOMAIN-KEYWORD,googlesyndication,🛑 广告拦截",
-            "DOMAIN-KEYWORD,googletagmanager,🛑 广告拦截",
-            "DOMAIN,pagead2.googlesyndication.com,🛑 广告拦截",
-            # Chinese services
-            "DOMAIN,clash.razord.top,🎯 全球直连",
-            "DOMAIN,yacd.haishan.me,🎯 全球直连",
-            # Specific services
-            "DOMAIN-KEYWORD,youtube,📹 YouTube",
-            "DOMAIN,youtubei.googleapis.com,📹 YouTube",
-            "DOMAIN-SUFFIX,googlevideo.com,📹 YouTube",
-            "DOMAIN-SUFFIX,youtube.com,📹 YouTube",
-            "DOMAIN-SUFFIX,ytimg.com,📹 YouTube",
-            "DOMAIN-KEYWORD,netflix,🎬 Netflix",
-            "DOMAIN-SUFFIX,netflix.com,🎬 Netflix",
-            "DOMAIN-SUFFIX,netflix.net,🎬 Netflix",
-            "DOMAIN-SUFFIX,nflximg.net,🎬 Netflix",
-            "DOMAIN-SUFFIX,nflxext.com,🎬 Netflix",
-            "DOMAIN-SUFFIX,nflxso.net,🎬 Netflix",
-            "DOMAIN-SUFFIX,nflxvideo.net,🎬 Netflix",
-            "DOMAIN-KEYWORD,telegram,📱 Telegram",
-            "DOMAIN-SUFFIX,t.me,📱 Telegram",
-            "DOMAIN-SUFFIX,tdesktop.com,📱 Telegram",
-            "DOMAIN-SUFFIX,telegram.me,📱 Telegram",
-            "DOMAIN-SUFFIX,telegram.org,📱 Telegram",
-            "DOMAIN-SUFFIX,telesco.pe,📱 Telegram",
-            "DOMAIN-KEYWORD,bilibili,📺 哔哩哔哩",
-            "DOMAIN-SUFFIX,acg.tv,📺 哔哩哔哩",
-            "DOMAIN-SUFFIX,acgvideo.com,📺 哔哩哔哩",
-            "DOMAIN-SUFFIX,b23.tv,📺 哔哩哔哩",
-            "DOMAIN-SUFFIX,bilibili.com,📺 哔哩哔哩",
-            "DOMAIN-SUFFIX,bilivideo.com,📺 哔哩哔哩",
-            "DOMAIN-SUFFIX,hdslb.com,📺 哔哩哔哩",
-            "DOMAIN,music.163.com,🎵 网易云音乐",
-            "DOMAIN-SUFFIX,music.163.com,🎵 网易云音乐",
-            "DOMAIN-SUFFIX,163yun.com,🎵 网易云音乐",
-            "DOMAIN-SUFFIX,126.net,🎵 网易云音乐",
-            "DOMAIN-SUFFIX,163.com,🎵 网易云音乐",
-            "DOMAIN-KEYWORD,microsoft,Ⓜ️ 微软服务",
-            "DOMAIN-SUFFIX,bing.com,Ⓜ️ 微软服务",
-            "DOMAIN-SUFFIX,microsoft.com,Ⓜ️ 微软服务",
-            "DOMAIN-SUFFIX,office.com,Ⓜ️ 微软服务",
-            "DOMAIN-SUFFIX,outlook.com,Ⓜ️ 微软服务",
-            "DOMAIN-SUFFIX,xbox.com,Ⓜ️ 微软服务",
-            "DOMAIN,mtalk.google.com,📢 谷歌FCM",
-            "DOMAIN,alt1-mtalk.google.com,📢 谷歌FCM",
-            "DOMAIN,alt2-mtalk.google.com,📢 谷歌FCM",
-            "DOMAIN,alt3-mtalk.google.com,📢 谷歌FCM",
-            "DOMAIN,alt4-mtalk.google.com,📢 谷歌FCM",
-            # GeoIP rules
-            "GEOIP,LAN,🎯 全球直连",
-            "GEOIP,CN,🎯 全球直连",
-            "MATCH,🐟 漏网之鱼",
-        ],
+        "proxy-groups": proxy_groups,
+        "rules": list(_STATIC_RULES),
     }
     return config
 
 
+def _yaml_escape(match: "re.Match[str]") -> str:
+    """Escape one character matched by _YAML_ESCAPE_RE"""
+    code = ord(match.group())
+    # A lone surrogate has no valid escape; use U+FFFD like UTF-8 errors do
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xFFFD
+    return f"\\u{code:04x}"
+
+
+def _scalar(value: Any) -> str:
+    """Render a scalar as a YAML plain or double-quoted string"""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return "null"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        # VMess JSON can carry floats in any field
+        if value != value:
+            return ".nan"
+        if value in (float("inf"), float("-inf")):
+            return ".inf" if value > 0 else "-.inf"
+        text = repr(value)
+        # YAML 1.1 only resolves exponent forms with a '.' as floats
+        return text if "." in text else text.replace("e", ".0e", 1)
+    if isinstance(value, dict) and not value:
+        return "{}"
+    if isinstance(value, (list, tuple)) and not value:
+        return "[]"
+    if not isinstance(value, str):
+        raise TypeError(f"Cannot emit {type(value).__name__} as YAML")
+
+    if (
+        _YAML_UNSAFE(value)
+        or not value.isprintable()
+        or value.lower() in _YAML_KEYWORDS
+    ):
+        # JSON strings are valid YAML double-quoted scalars
+        quoted = json.dumps(value, ensure_ascii=False)
+        return _YAML_ESCAPE_RE.sub(_yaml_escape, quoted)
+    return value
+
+
+def _emit(obj: Any, out: TextIO, indent: str = "", first: Optional[str] = None) -> None:
+    """Write a mapping or sequence to out in YAML block style"""
+    prefix = indent if first is None else first
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            line = f"{prefix}{_scalar(key)}:"
+            if isinstance(value, dict) and value:
+                out.write(line + "\n")
+                _emit(value, out, indent + "  ")
+            elif isinstance(value, (list, tuple)) and value:
+                # Sequences under a mapping key are not indented, like PyYAML
+                out.write(line + "\n")
+                _emit(value, out, indent)
+            else:
+                out.write(f"{line} {_scalar(value)}\n")
+            prefix = indent
+    else:
+        for item in obj:
+            if isinstance(item, (dict, list, tuple)) and item:
+                _emit(item, out, indent + "  ", prefix + "- ")
+            else:
+                out.write(f"{prefix}- {_scalar(item)}\n")
+            prefix = indent
+
+
+def dump_yaml(config: Dict[str, Any], stream: Optional[TextIO] = None) -> Optional[str]:
+    """Serialize a Clash configuration to YAML, returning it if no stream is given"""
+    if stream is not None:
+        _emit(config, stream)
+        return None
+    out = io.StringIO()
+    _emit(config, out)
+    return out.getvalue()
+
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(
@@ -525,7 +674,7 @@ Supported proxy formats:
             sys.exit(1)
 
         # Parse subscription
-        proxies = parse_subscription(content)
+        proxies, proxy_names = _parse_proxies(content)
 
         if not proxies:
             print("Error: No valid proxies found in input", file=sys.stderr)
@@ -534,13 +683,21 @@ Supported proxy formats:
         print(f"Found {len(proxies)} proxies", file=sys.stderr)
 
         # Generate Clash config
-        clash_config = generate_clash_config(proxies)
+        clash_config = generate_clash_config(proxies, proxy_names)
 
-        # Output YAML
-        yaml_output = yaml.dump(
-            clash_config, default_flow_style=False, allow_unicode=True, sort_keys=False
-        )
-        print(yaml_output)
+        # Stream YAML out as UTF-8 whatever the locale's stdout encoding
+        stdout_buffer = getattr(sys.stdout, "buffer", None)
+        if stdout_buffer is not None:
+            sys.stdout.flush()
+            out = io.TextIOWrapper(stdout_buffer, encoding="utf-8", newline="\n")
+            try:
+                dump_yaml(clash_config, out)
+            finally:
+                # Hand the buffer back without closing sys.stdout
+                out.flush()
+                out.detach()
+        else:
+            dump_yaml(clash_config, sys.stdout)
 
     except KeyboardInterrupt:
         sys.exit(1)
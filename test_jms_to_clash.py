@@ -4,7 +4,12 @@ Test suite for JMS to Clash converter using pytest framework
 Run with: python -m pytest test_jms_to_clash.py -v
 """
 
+import base64
+import copy
+import io
+import json
 import os
+import subprocess
 import sys
 from io import StringIO
 from unittest.mock import patch
@@ -12,6 +17,11 @@ from unittest.mock import patch
 import pytest
 import yaml
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
@@ -20,20 +30,44 @@ from jms_to_clash import (
     decode_trojan,
     decode_vless,
     decode_vmess,
+    dump_yaml,
     generate_clash_config,
     main,
     parse_subscription,
 )
 
+VMESS_TCP_URL = "vmess://eyJhZGQiOiJleGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6IjEyMzQ1Njc4LTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6InRjcCIsInBvcnQiOiI0NDMiLCJwcyI6IlRlc3QgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoidGxzIiwidiI6IjIifQ=="
+VMESS_WS_URL = "vmess://eyJhZGQiOiJ3cy5leGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6Ijk4NzY1NDMyLTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6IndzIiwicGF0aCI6Ii9wYXRoIiwicG9ydCI6IjgwIiwicHMiOiJXZWJTb2NrZXQgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoiIiwidiI6IjIiLCJob3N0Ijoid3MuZXhhbXBsZS5jb20ifQ=="
+VLESS_URL = "vless://12345678-1234-1234-1234-123456789abc@example.com:443?type=tcp&security=tls&sni=example.com#Test%20VLESS"
+SS_URL = "ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example.com:8388#Test%20SS"
+TROJAN_URL = "trojan://password123@example.com:443?sni=example.com#Test%20Trojan"
+
+# VMess payload whose name is not valid UTF-8
+INVALID_UTF8_VMESS = b'{"add": "example.com", "port": "443", "ps": "Node \xff"}'
+INVALID_UTF8_VMESS_URL = "vmess://" + base64.b64encode(INVALID_UTF8_VMESS).decode()
+
+PLAIN_SUB = f"{VMESS_TCP_URL}\n{SS_URL}"
+ENCODED_SUB = base64.b64encode(PLAIN_SUB.encode()).decode()
+
+
+@pytest.fixture(scope="session")
+def _vmess_tcp_decoded():
+    """VMess TCP proxy decoded once per session; only copies are handed out"""
+    return decode_vmess(VMESS_TCP_URL)
+
+
+@pytest.fixture
+def vmess_tcp_proxy(_vmess_tcp_decoded):
+    """Fresh copy of the decoded VMess TCP proxy, safe to mutate"""
+    return copy.deepcopy(_vmess_tcp_decoded)
+
 
 class TestProxyDecoders:
     """Test individual proxy format decoders"""
 
-    def test_decode_vmess(self):
+    def test_decode_vmess(self, vmess_tcp_proxy):
         """Test VMess URL decoding"""
-        vmess_url = "vmess://eyJhZGQiOiJleGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6IjEyMzQ1Njc4LTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6InRjcCIsInBvcnQiOiI0NDMiLCJwcyI6IlRlc3QgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoidGxzIiwidiI6IjIifQ=="
-
-        result = decode_vmess(vmess_url)
+        result = vmess_tcp_proxy
 
         assert result is not None
         assert result["name"] == "Test VMess"
@@ -46,7 +80,7 @@ class TestProxyDecoders:
 
     def test_decode_vmess_websocket(self):
         """Test VMess WebSocket decoding"""
-        vmess_url = "vmess://eyJhZGQiOiJ3cy5leGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6Ijk4NzY1NDMyLTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6IndzIiwicGF0aCI6Ii9wYXRoIiwicG9ydCI6IjgwIiwicHMiOiJXZWJTb2NrZXQgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoiIiwidiI6IjIiLCJob3N0Ijoid3MuZXhhbXBsZS5jb20ifQ=="
+        vmess_url = VMESS_WS_URL
 
         result = decode_vmess(vmess_url)
 
@@ -55,9 +89,42 @@ class TestProxyDecoders:
         assert result["ws-opts"]["path"] == "/path"
         assert result["ws-opts"]["headers"]["Host"] == "ws.example.com"
 
+    @pytest.mark.parametrize("backend", ["json", "orjson"])
+    def test_decode_vmess_json_backends(self, backend):
+        """Test VMess decoding with each supported JSON parser"""
+        module = pytest.importorskip(backend)
+
+        with patch("jms_to_clash._json_loads", module.loads):
+            result = decode_vmess(VMESS_TCP_URL)
+            invalid = decode_vmess(INVALID_UTF8_VMESS_URL)
+
+        assert result is not None
+        assert result["name"] == "Test VMess"
+        assert invalid is not None
+        assert invalid["name"] == "Node \ufffd"
+
+    def test_decode_vmess_urlsafe_base64(self):
+        """Test VMess decoding with URL-safe, unpadded base64"""
+        vmess_config = {
+            "add": "example.com",
+            "id": "12345678-1234-1234-1234-1234567890ab",
+            "port": "443",
+            "ps": "香港 01 ~?>",
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(vmess_config, ensure_ascii=False).encode()
+        ).decode()
+        assert "_" in encoded or "-" in encoded
+
+        result = decode_vmess("vmess://" + encoded.rstrip("="))
+
+        assert result is not None
+        assert result["name"] == "香港 01 ~?>"
+        assert result["server"] == "example.com"
+
     def test_decode_vless(self):
         """Test VLESS URL decoding"""
-        vless_url = "vless://12345678-1234-1234-1234-123456789abc@example.com:443?type=tcp&security=tls&sni=example.com#Test%20VLESS"
+        vless_url = VLESS_URL
 
         result = decode_vless(vless_url)
 
@@ -70,9 +137,34 @@ class TestProxyDecoders:
         assert result["network"] == "tcp"
         assert result["tls"] is True
 
+    def test_decode_vless_websocket_query(self):
+        """Test VLESS query values are unquoted and blank ones fall back"""
+        vless_url = (
+            "vless://12345678-1234-1234-1234-123456789abc@example.com:443"
+            "?type=ws&path=%2Fws%3Fed%3D2048&host=cdn.example.com&sni=&path=/x"
+            "#WS%20VLESS"
+        )
+
+        result = decode_vless(vless_url)
+
+        assert result is not None
+        assert result["ws-opts"]["path"] == "/ws?ed=2048"
+        assert result["ws-opts"]["headers"] == {"Host": "cdn.example.com"}
+        assert result["servername"] == ""
+
+    def test_decode_vless_empty_port(self):
+        """Test that an empty port falls back to 443, as urlparse allowed"""
+        result = decode_vless(
+            "vless://12345678-1234-1234-1234-123456789abc@example.com:#Empty"
+        )
+
+        assert result is not None
+        assert result["server"] == "example.com"
+        assert result["port"] == 443
+
     def test_decode_shadowsocks(self):
         """Test Shadowsocks URL decoding"""
-        ss_url = "ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example.com:8388#Test%20SS"
+        ss_url = SS_URL
 
         result = decode_ss(ss_url)
 
@@ -84,11 +176,23 @@ class TestProxyDecoders:
         assert result["cipher"] == "aes-256-gcm"
         assert result["password"] == "password"
 
+    def test_decode_shadowsocks_legacy(self):
+        """Test legacy Shadowsocks URL with the whole userinfo in base64"""
+        payload = base64.b64encode(b"aes-256-gcm:p@ss:word@example.com:8388")
+        ss_url = f"ss://{payload.decode()}#Legacy%20SS"
+
+        result = decode_ss(ss_url)
+
+        assert result is not None
+        assert result["name"] == "Legacy SS"
+        assert result["server"] == "example.com"
+        assert result["port"] == 8388
+        assert result["cipher"] == "aes-256-gcm"
+        assert result["password"] == "p@ss:word"
+
     def test_decode_trojan(self):
         """Test Trojan URL decoding"""
-        trojan_url = (
-            "trojan://password123@example.com:443?sni=example.com#Test%20Trojan"
-        )
+        trojan_url = TROJAN_URL
 
         result = decode_trojan(trojan_url)
 
@@ -100,6 +204,15 @@ class TestProxyDecoders:
         assert result["password"] == "password123"
         assert result["sni"] == "example.com"
 
+    def test_decode_trojan_password_with_colon(self):
+        """Test that a ':' in the Trojan password is kept, not split off"""
+        result = decode_trojan("trojan://pa:ss@example.com:443#Colon")
+
+        assert result is not None
+        assert result["password"] == "pa:ss"
+        assert result["server"] == "example.com"
+        assert result["port"] == 443
+
     def test_decode_invalid_url(self):
         """Test handling of invalid URLs"""
         assert decode_vmess("invalid_url") is None
@@ -115,14 +228,14 @@ class TestProxyDecoders:
 class TestSubscriptionParsing:
     """Test subscription parsing functionality"""
 
-    def test_parse_mixed_subscription(self):
+    def test_parse_mixed_subscription(self, vmess_tcp_proxy):
         """Test parsing subscription with multiple proxy types"""
-        subscription = """# Test subscription
-vmess://eyJhZGQiOiJleGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6IjEyMzQ1Njc4LTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6InRjcCIsInBvcnQiOiI0NDMiLCJwcyI6IlRlc3QgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoidGxzIiwidiI6IjIifQ==
-ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example.com:8388#Test%20SS
-trojan://password123@example.com:443?sni=example.com#Test%20Trojan
+        subscription = f"""# Test subscription
+{VMESS_TCP_URL}
+{SS_URL}
+{TROJAN_URL}
 # Another comment
-vless://12345678-1234-1234-1234-123456789abc@example.com:443?type=tcp&security=tls&sni=example.com#Test%20VLESS"""
+{VLESS_URL}"""
 
         proxies = parse_subscription(subscription)
 
@@ -131,20 +244,32 @@ vless://12345678-1234-1234-1234-123456789abc@example.com:443?type=tcp&security=t
         assert proxies[1]["name"] == "Test SS"
         assert proxies[2]["name"] == "Test Trojan"
         assert proxies[3]["name"] == "Test VLESS"
+        assert proxies[0] == vmess_tcp_proxy
 
-    def test_parse_base64_subscription(self):
+    def test_parse_base64_subscription(self, vmess_tcp_proxy):
         """Test parsing base64 encoded subscription"""
-        import base64
-
-        plain_subscription = """vmess://eyJhZGQiOiJleGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6IjEyMzQ1Njc4LTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6InRjcCIsInBvcnQiOiI0NDMiLCJwcyI6IlRlc3QgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoidGxzIiwidiI6IjIifQ==
-ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example.com:8388#Test%20SS"""
-
-        encoded_subscription = base64.b64encode(plain_subscription.encode()).decode()
-        proxies = parse_subscription(encoded_subscription)
+        proxies = parse_subscription(ENCODED_SUB)
 
         assert len(proxies) == 2
         assert proxies[0]["name"] == "Test VMess"
         assert proxies[1]["name"] == "Test SS"
+        assert proxies[0] == vmess_tcp_proxy
+
+    def test_parse_wrapped_base64_subscription(self):
+        """Test parsing base64 subscription wrapped at 76 columns"""
+        wrapped = base64.encodebytes(PLAIN_SUB.encode()).decode()
+        assert wrapped.count("\n") > 1
+
+        proxies = parse_subscription(wrapped)
+
+        assert [proxy["name"] for proxy in proxies] == ["Test VMess", "Test SS"]
+
+    @pytest.mark.parametrize("separator", ["\n", "\r\n", "\r", "\n\n"])
+    def test_parse_line_endings(self, separator):
+        """Test that Windows, old Mac and blank-line separators all split"""
+        proxies = parse_subscription(separator.join([SS_URL, TROJAN_URL]))
+
+        assert [proxy["name"] for proxy in proxies] == ["Test SS", "Test Trojan"]
 
     def test_parse_empty_subscription(self):
         """Test parsing empty subscription"""
@@ -219,6 +344,28 @@ class TestConfigGeneration:
         assert "119.29.29.29" in config["dns"]["nameserver"]
         assert "223.5.5.5" in config["dns"]["nameserver"]
 
+    def test_groups_with_same_members_share_one_list(self):
+        """Test the documented aliasing of identical group member lists"""
+        groups = generate_clash_config([], ["A", "B"])["proxy-groups"]
+        by_name = {group["name"]: group["proxies"] for group in groups}
+
+        assert by_name["📹 YouTube"] is by_name["🎬 Netflix"]
+        assert by_name["📹 YouTube"] is not by_name["🚀 节点选择"]
+        assert "&id" not in dump_yaml({"proxy-groups": groups})
+
+    def test_config_edits_do_not_leak_into_later_calls(self):
+        """Test that mutating one generated config leaves the next one intact"""
+        config = generate_clash_config([])
+        config["dns"]["fake-ip-filter"].append("leak.example")
+        config["dns"]["enable"] = False
+        config["rules"].append("MATCH,DIRECT")
+
+        fresh = generate_clash_config([])
+
+        assert "leak.example" not in fresh["dns"]["fake-ip-filter"]
+        assert fresh["dns"]["enable"] is True
+        assert "MATCH,DIRECT" not in fresh["rules"]
+
     def test_empty_proxies_config(self):
         """Test generating config with no proxies"""
         config = generate_clash_config([])
@@ -244,12 +391,11 @@ class TestYAMLOutput:
         ]
 
         config = generate_clash_config(proxies)
-        yaml_output = yaml.dump(
-            config, default_flow_style=False, allow_unicode=True, sort_keys=False
-        )
+        yaml_output = dump_yaml(config)
 
-        # Should be able to load it back
-        loaded_config = yaml.safe_load(yaml_output)
+        # Should load back, once, into exactly the same config
+        loaded_config = yaml.load(yaml_output, Loader=_Loader)
+        assert loaded_config == config
         assert loaded_config["port"] == 7890
         assert len(loaded_config["proxies"]) == 1
 
@@ -266,20 +412,94 @@ class TestYAMLOutput:
         ]
 
         config = generate_clash_config(proxies)
-        yaml_output = yaml.dump(
-            config, default_flow_style=False, allow_unicode=True, sort_keys=False
-        )
+        yaml_output = dump_yaml(config)
 
         assert "测试服务器" in yaml_output
         assert "节点选择" in yaml_output
 
+    def test_dump_yaml_round_trip(self):
+        """Test that the built-in emitter output loads back unchanged"""
+        proxies = [
+            {
+                "name": name,
+                "type": "trojan",
+                "server": "example.com",
+                "port": 443,
+                "password": name,
+                "skip-cert-verify": True,
+                "ws-opts": {"path": "/", "headers": {}},
+            }
+            for name in [
+                "🚀 香港 01",
+                "yes",
+                "null",
+                "8080",
+                "- dash",
+                "key: value",
+                "tag #comment",
+                '"quoted"',
+                "*alias",
+                "trailing ",
+                "line\nbreak",
+                "",
+            ]
+        ]
+
+        config = generate_clash_config(proxies)
+        yaml_output = dump_yaml(config)
+
+        assert yaml.load(yaml_output, Loader=_Loader) == config
+        assert "- 🚀 香港 01\n" in yaml_output
+
+    def test_dump_yaml_keeps_int_zero_distinct_from_false(self):
+        """Test that the emitter writes 0 as an int, never as false"""
+        config = {"allow-lan": 0, "ipv6": False, "dns": {"ipv6": 0}}
+
+        yaml_output = dump_yaml(config)
+        loaded = yaml.load(yaml_output, Loader=_Loader)
+
+        # 0 == False in Python, so check the text and types, not just equality
+        assert yaml_output == "allow-lan: 0\nipv6: false\ndns:\n  ipv6: 0\n"
+        assert type(loaded["allow-lan"]) is int
+        assert type(loaded["dns"]["ipv6"]) is int
+        assert loaded["ipv6"] is False
+
+    def test_dump_yaml_floats(self):
+        """Test that floats, including exponents and specials, round-trip"""
+        values = [1.5, 1.0, -0.25, 1e16, 1e-05, float("inf"), float("-inf")]
+        config = {"values": values, "nan": float("nan")}
+
+        loaded = yaml.load(dump_yaml(config), Loader=_Loader)
+
+        assert loaded["values"] == values
+        assert all(type(value) is float for value in loaded["values"])
+        assert loaded["nan"] != loaded["nan"]
+
+    def test_dump_yaml_lone_surrogates(self):
+        """Test that lone surrogates become U+FFFD and the output stays valid"""
+        config = {"name": "Node \ud800", "password": "\udfff"}
+
+        yaml_output = dump_yaml(config)
+        yaml_output.encode("utf-8")
+
+        loaded = yaml.load(yaml_output, Loader=_Loader)
+        assert loaded == {"name": "Node \ufffd", "password": "\ufffd"}
+
+    def test_dump_yaml_to_stream(self):
+        """Test that writing to a stream matches the returned string"""
+        config = generate_clash_config([])
+        stream = StringIO()
+
+        assert dump_yaml(config, stream) is None
+        assert stream.getvalue() == dump_yaml(config)
+
 
 class TestMainFunction:
     """Test main function and CLI integration"""
 
-    def test_main_with_valid_input(self):
+    def test_main_with_valid_input(self, vmess_tcp_proxy):
         """Test main function with valid input"""
-        test_input = "vmess://eyJhZGQiOiJleGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6IjEyMzQ1Njc4LTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6InRjcCIsInBvcnQiOiI0NDMiLCJwcyI6IlRlc3QgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoidGxzIiwidiI6IjIifQ=="
+        test_input = VMESS_TCP_URL
 
         with patch("sys.stdin", StringIO(test_input)):
             with patch("sys.stdout", StringIO()) as mock_stdout:
@@ -292,6 +512,61 @@ class TestMainFunction:
                 output = mock_stdout.getvalue()
                 assert "port: 7890" in output
                 assert "Test VMess" in output
+                assert vmess_tcp_proxy["uuid"] in output
+
+    def test_main_output_round_trip(self, vmess_tcp_proxy):
+        """Test that main output loads back to the generated config"""
+        test_input = VMESS_TCP_URL
+
+        with patch("sys.stdin", StringIO(test_input)):
+            with patch("sys.stdout", StringIO()) as mock_stdout:
+                with patch("sys.argv", ["jms_to_clash.py"]):
+                    main()
+
+        expected = generate_clash_config([vmess_tcp_proxy])
+        assert yaml.load(mock_stdout.getvalue(), Loader=_Loader) == expected
+
+    def test_main_writes_utf8_bytes(self):
+        """Test that output is UTF-8 regardless of the stdout encoding"""
+        test_input = "ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example.com:8388#测试节点"
+        raw_stdout = io.BytesIO()
+        stdout = io.TextIOWrapper(raw_stdout, encoding="ascii")
+
+        with patch("sys.stdin", StringIO(test_input)):
+            with patch("sys.stdout", stdout):
+                with patch("sys.argv", ["jms_to_clash.py"]):
+                    main()
+
+        output = raw_stdout.getvalue().decode("utf-8")
+        assert "- 测试节点" in output
+        assert "🚀 节点选择" in output
+
+    def test_main_streams_complete_yaml_for_any_json_values(self):
+        """Test that odd VMess JSON values can't truncate the streamed output"""
+        vmess_config = {
+            "add": "example.com",
+            "port": "443",
+            "ps": 1.5,
+            "net": "ws",
+            "path": 1.0,
+            "host": {"nested": [1, None, 2.5e-08]},
+            "id": "\ud800",
+        }
+        encoded = base64.b64encode(json.dumps(vmess_config).encode()).decode()
+        raw_stdout = io.BytesIO()
+        stdout = io.TextIOWrapper(raw_stdout, encoding="utf-8")
+
+        with patch("jms_to_clash._json_loads", json.loads):
+            with patch("sys.stdin", StringIO(f"vmess://{encoded}")):
+                with patch("sys.stdout", stdout):
+                    with patch("sys.argv", ["jms_to_clash.py"]):
+                        main()
+
+        loaded = yaml.load(raw_stdout.getvalue().decode("utf-8"), Loader=_Loader)
+        assert loaded["proxies"][0]["name"] == 1.5
+        assert loaded["proxies"][0]["ws-opts"]["path"] == 1.0
+        assert loaded["proxies"][0]["uuid"] == "\ufffd"
+        assert loaded["rules"][-1] == "MATCH,🐟 漏网之鱼"
 
     def test_main_with_empty_input(self):
         """Test main function with empty input"""
@@ -323,6 +598,20 @@ class TestMainFunction:
             # Version should exit with code 0
             assert exc_info.value.code == 0
 
+    def test_version_does_not_import_yaml(self):
+        """Test that the CLI starts without loading PyYAML"""
+        script = os.path.join(os.path.dirname(__file__), "src", "jms_to_clash.py")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", script, "--version"],
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0
+        assert "jms2clash" in result.stdout
+        assert "| yaml" not in result.stderr
+        assert "| orjson" not in result.stderr
+
     def test_main_invalid_option(self):
         """Test main function with invalid option"""
         with patch("sys.argv", ["jms_to_clash.py", "--invalid"]):
@@ -350,24 +639,29 @@ class TestErrorHandling:
                 # If it returns something, it should at least have basic structure
                 assert isinstance(result, dict)
 
-    def test_malformed_subscription(self):
+    def test_malformed_subscription(self, vmess_tcp_proxy):
         """Test handling of subscription with malformed URLs"""
-        subscription = """vmess://invalid_base64
+        subscription = f"""vmess://invalid_base64
 ss://also_invalid
 valid_line_but_not_proxy_url
-vmess://eyJhZGQiOiJleGFtcGxlLmNvbSIsImFpZCI6IjAiLCJpZCI6IjEyMzQ1Njc4LTEyMzQtMTIzNC0xMjM0LTEyMzQ1Njc4OTBhYiIsIm5ldCI6InRjcCIsInBvcnQiOiI0NDMiLCJwcyI6IlRlc3QgVk1lc3MiLCJzY3kiOiJhdXRvIiwidGxzIjoidGxzIiwidiI6IjIifQ=="""
+{VMESS_TCP_URL}"""
 
         proxies = parse_subscription(subscription)
         # Should only parse the valid VMess URL
         assert len(proxies) == 1
         assert proxies[0]["name"] == "Test VMess"
+        assert proxies[0] == vmess_tcp_proxy
+
+    def test_invalid_utf8_in_vmess_name(self):
+        """Test that invalid UTF-8 in a VMess payload only affects the name"""
+        result = decode_vmess(INVALID_UTF8_VMESS_URL)
+        assert result is not None
+        assert result["server"] == "example.com"
+        assert result["name"] == "Node \ufffd"
 
     def test_special_characters_in_names(self):
         """Test handling of special characters in proxy names"""
         # Create a VMess config with special characters in name
-        import base64
-        import json
-
         vmess_config = {
             "add": "example.com",
             "aid": "0",